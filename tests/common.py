@@ -4,10 +4,13 @@
 """ test common utilities."""
 
 import argparse
+import io
+import multiprocessing
 import os
 import sys
 import unittest
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 from distutils.version import LooseVersion
 from parameterized import parameterized
@@ -56,6 +59,7 @@ class TestConfig(object):
         self.backend_version = self._get_backend_version()
         self.log_level = logging.WARNING
         self.temp_dir = utils.get_temp_directory()
+        self.jobs = 1
 
     @property
     def is_mac(self):
@@ -112,9 +116,13 @@ class TestConfig(object):
             parser.add_argument("--verbose", "-v", help="verbose output, option is additive", action="count")
             parser.add_argument("--debug", help="output debugging information", action="store_true")
             parser.add_argument("--temp_dir", help="temp dir")
+            parser.add_argument("--jobs", "-j", type=int, default=config.jobs,
+                                help="number of processes to run tests in, 0 for one per cpu")
             parser.add_argument("unittest_args", nargs='*')
 
             args = parser.parse_args()
+            if args.jobs < 0:
+                parser.error("--jobs must be 0 or a positive number")
             if args.debug:
                 utils.set_debug_mode(True)
 
@@ -124,6 +132,7 @@ class TestConfig(object):
             config.log_level = logging.get_verbosity_level(args.verbose, config.log_level)
             if args.temp_dir:
                 config.temp_dir = args.temp_dir
+            config.jobs = args.jobs or os.cpu_count()
 
             # Now set the sys.argv to the unittest_args (leaving sys.argv[0] alone)
             sys.argv[1:] = args.unittest_args
@@ -146,9 +155,68 @@ def unittest_main():
     logging.basicConfig(level=config.log_level)
     with logging.set_scope_level(logging.INFO) as logger:
         logger.info(config)
+    if config.jobs > 1:
+        # under pytest, use pytest-xdist (pytest -n auto) instead
+        sys.exit(0 if _run_tests_in_parallel(config.jobs) else 1)
     unittest.main()
 
 
+def _get_test_ids(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _get_test_ids(test)
+        else:
+            yield test.id()
+
+
+def _run_tests_in_worker(test_ids):
+    stream = io.StringIO()
+    suite = unittest.defaultTestLoader.loadTestsFromNames(test_ids)
+    result = unittest.TextTestRunner(stream=stream).run(suite)
+    failed_ids = [test.id() for test, _ in result.failures + result.errors]
+    failed_ids += [test.id() for test in result.unexpectedSuccesses]
+    return result.wasSuccessful(), result.testsRun, len(result.skipped), failed_ids, stream.getvalue()
+
+
+def _run_tests_in_parallel(jobs):
+    """Run the tests of __main__, or the ones named on the command line, in a pool of processes."""
+    # workers only see the parsed --opset/--backend/... through the TestConfig they inherit on fork,
+    # a spawned worker would re-import the test module and build its config from the rewritten sys.argv
+    utils.make_sure(multiprocessing.get_start_method() == "fork",
+                    "--jobs needs the fork start method, not %s", multiprocessing.get_start_method())
+    test_names = sys.argv[1:]
+    utils.make_sure(not any(arg.startswith("-") for arg in test_names),
+                    "unittest options are not supported with --jobs, only test names: %s", " ".join(test_names))
+    main_module = sys.modules["__main__"]
+    if test_names:
+        suite = unittest.defaultTestLoader.loadTestsFromNames(test_names, main_module)
+    else:
+        suite = unittest.defaultTestLoader.loadTestsFromModule(main_module)
+    test_ids = list(_get_test_ids(suite))
+    # hand out consecutive tests in batches, one round trip to the pool per batch rather than per test,
+    # while a few batches per worker still balance the load
+    batch_size = max(1, len(test_ids) // (jobs * 4))
+    batches = [test_ids[i:i + batch_size] for i in range(0, len(test_ids), batch_size)]
+    successful = True
+    tests_run = 0
+    skipped = 0
+    failed_ids = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(_run_tests_in_worker, batches)
+        for batch_successful, batch_tests_run, batch_skipped, batch_failed_ids, output in results:
+            tests_run += batch_tests_run
+            skipped += batch_skipped
+            failed_ids.extend(batch_failed_ids)
+            if not batch_successful:
+                successful = False
+                sys.stderr.write(output)
+    sys.stderr.write("Ran {} tests in {} processes\n".format(tests_run, jobs))
+    if failed_ids:
+        sys.stderr.write("FAILED: {}\n".format(", ".join(failed_ids)))
+    sys.stderr.write("{} (skipped={})\n".format("OK" if successful else "FAILED", skipped))
+    return successful
+
+
 def _append_message(reason, message):
     if message:
         reason = reason + ": " + message
@@ -3,49 +3,148 @@
 
 """Unit Tests for optimizers such as TransposeOptimizer."""
 
-from __future__ import division
-from __future__ import print_function
-from __future__ import unicode_literals
+import functools
 
 import numpy as np
-from onnx import helper, TensorProto, OperatorSetIdProto
+from google.protobuf import text_format
+from onnx import helper, TensorProto, OperatorSetIdProto, GraphProto, NodeProto
 from tf2onnx import utils, constants
 from tf2onnx.graph import GraphUtil
 from backend_test_base import Tf2OnnxBackendTestBase
 from common import unittest_main, group_nodes_by_type, check_opset_min_version, check_opset_max_version
 
-
-# pylint: disable=missing-docstring,invalid-name,unused-argument,using-constant-test
+# tests that just need some (2, 3, 4, 5) input share _X_2345, drawn from its own seeded Generator so it
+# does not depend on which tests ran first; it is read-only since every test sees the same array
+_X_2345 = np.random.default_rng(0).standard_normal((2, 3, 4, 5), dtype=np.float32)
+_X_2345.setflags(write=False)
+
+# graph pieces shared by the tests that wrap NHWC ops between a pair of transposes, parsed in one go
+# from text; make_graph copies them into each graph
+_TRANSPOSE_GRAPH_TEMPLATE = """
+node {
+  input: "X" output: "Y" name: "trans_1" op_type: "Transpose"
+  attribute { name: "perm" ints: 0 ints: 2 ints: 3 ints: 1 type: INTS }
+}
+node {
+  input: "Z" output: "Z1" name: "trans_2" op_type: "Transpose"
+  attribute { name: "perm" ints: 0 ints: 3 ints: 1 ints: 2 type: INTS }
+}
+input {
+  name: "X"
+  type {
+    tensor_type {
+      elem_type: 1  # FLOAT
+      shape { dim { dim_value: 2 } dim { dim_value: 3 } dim { dim_value: 4 } dim { dim_value: 5 } }
+    }
+  }
+}
+output {
+  name: "Z1"
+  type {
+    tensor_type {
+      elem_type: 1  # FLOAT
+      shape { dim { dim_value: 2 } dim { dim_value: 3 } dim { dim_value: 4 } dim { dim_value: 5 } }
+    }
+  }
+}
+"""
+_TRANSPOSE_GRAPH = text_format.Parse(_TRANSPOSE_GRAPH_TEMPLATE, GraphProto())
+_TRANS_NCHW_TO_NHWC, _TRANS_NHWC_TO_NCHW = _TRANSPOSE_GRAPH.node
+_X_INFO, = _TRANSPOSE_GRAPH.input
+_Z1_INFO, = _TRANSPOSE_GRAPH.output
+# the perm attributes of the shared transposes also build the other Transpose nodes of the tests,
+# attribute.append copies them into each node
+_PERM_NCHW_TO_NHWC, = _TRANS_NCHW_TO_NHWC.attribute
+_PERM_NHWC_TO_NCHW, = _TRANS_NHWC_TO_NCHW.attribute
+
+# fp16 input for the structural tests whose ops all have fp16 kernels in onnxruntime,
+# which is not the case for Relu, LeakyRelu, Mul or Max on cpu
+_X_FP16_INFO = helper.make_tensor_value_info("X", TensorProto.FLOAT16, (2, 3, 4, 5))
+_X_2345_FP16 = _X_2345.astype(np.float16)
+_X_2345_FP16.setflags(write=False)
+
+
+def _make_transpose(inp, out, perm, name=None):
+    """Make a Transpose node from a prebuilt perm attribute, without make_node converting the kwargs."""
+    node = NodeProto()
+    node.op_type = "Transpose"
+    node.input.append(inp)
+    node.output.append(out)
+    node.attribute.append(perm)
+    if name:
+        node.name = name
+    return node
+
+
+def _make_nchw_nhwc_transpose_graph(nodes, name):
+    """Make graph X -> Transpose -> Y -> nodes -> Z -> Transpose -> Z1."""
+    return helper.make_graph([_TRANS_NCHW_TO_NHWC, *nodes, _TRANS_NHWC_TO_NCHW], name, [_X_INFO], [_Z1_INFO])
+
+
+# pylint: disable=missing-docstring,invalid-name,unused-argument,using-constant-test,import-outside-toplevel
 
 class OptimizerTests(Tf2OnnxBackendTestBase):
     """Run original model proto and modified model proto with onnxruntime, compare the results."""
 
+    def setUp(self):
+        super().setUp()
+        # per-test Generator so each test gets the same inputs whatever runs before it;
+        # it draws float32 samples directly rather than casting float64 ones
+        self.rng = np.random.default_rng(1)
+
+    def run_onnxruntime_from_proto(self, model_proto, inputs, output_names):
+        """Run test against onnxruntime backend, loading the model from memory."""
+        import onnxruntime as rt
+        opt = rt.SessionOptions()
+        # compare the graphs as tf2onnx left them, without onnxruntime optimizing them again
+        opt.graph_optimization_level = rt.GraphOptimizationLevel.ORT_DISABLE_ALL
+        # the test models are tiny, thread pools and memory arenas cost more than they save
+        opt.intra_op_num_threads = 1
+        opt.inter_op_num_threads = 1
+        opt.enable_cpu_mem_arena = False
+        opt.enable_mem_pattern = False
+        session = rt.InferenceSession(model_proto.SerializeToString(), opt, providers=["CPUExecutionProvider"])
+        return session.run(output_names, inputs)
+
+    @staticmethod
+    def _is_same_graph(origin_proto, new_proto):
+        origin_graph, new_graph = origin_proto.graph, new_proto.graph
+        return (list(origin_graph.node) == list(new_graph.node) and
+                list(origin_graph.initializer) == list(new_graph.initializer))
+
     def run_and_compare(self, output_names_with_port, onnx_feed_dict, origin_proto, op_type,
                         remaining_op_num, debug=False, rtol=1e-07):
         utils.make_sure(op_type is not None, "op_type should be specified")
         utils.make_sure(remaining_op_num is not None, "remaining_op_num should be specified")
 
-        origin_model_path = self.save_onnx_model(origin_proto, onnx_feed_dict, postfix="_origin")
-
         new_proto = GraphUtil.optimize_model_proto(origin_proto)
 
         self.assertTrue(new_proto, msg="model proto after optimizer should not be None")
 
-        new_model_path = self.save_onnx_model(new_proto, onnx_feed_dict, postfix="_opt")
-        current = GraphUtil.get_node_count_from_onnx_graph(new_proto.graph)
+        if debug or self.config.is_debug_mode:
+            self.save_onnx_model(origin_proto, onnx_feed_dict, postfix="_origin")
+            self.save_onnx_model(new_proto, onnx_feed_dict, postfix="_opt")
+        current = sum(1 for node in new_proto.graph.node if node.op_type == op_type)
 
-        self.assertTrue(current[op_type] == remaining_op_num,
-                        msg="Expect " + str(remaining_op_num) + " " + op_type + " ops left, but actually " + str(
-                            current[op_type]) + " left")
+        self.assertEqual(current, remaining_op_num,
+                         msg="Expect " + str(remaining_op_num) + " " + op_type + " ops left, but actually " + str(
+                             current) + " left")
 
         if self.config.is_onnxruntime_backend:
-            expected = self.run_onnxruntime(origin_model_path, onnx_feed_dict, output_names_with_port)
-            actual = self.run_onnxruntime(new_model_path, onnx_feed_dict, output_names_with_port)
+            expected = self.run_onnxruntime_from_proto(origin_proto, onnx_feed_dict, output_names_with_port)
+            if self._is_same_graph(origin_proto, new_proto):
+                # the optimizer left the graph as it was, running it again can't give different results
+                actual = expected
+            else:
+                actual = self.run_onnxruntime_from_proto(new_proto, onnx_feed_dict, output_names_with_port)
         else:
             raise ValueError("only onnxruntime is supported to test transpose optimizer")
 
         for expected_val, actual_val in zip(expected, actual):
-            self.assertAllClose(expected_val, actual_val, rtol=rtol, atol=1e-5)
+            if np.issubdtype(expected_val.dtype, np.integer) or expected_val.dtype == np.bool_:
+                self.assertAllEqual(expected_val, actual_val)
+            else:
+                self.assertAllClose(expected_val, actual_val, rtol=rtol, atol=1e-5)
             self.assertEqual(expected_val.dtype, actual_val.dtype)
             self.assertEqual(expected_val.shape, actual_val.shape)
 
@@ -78,10 +177,7 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
 
     # Tranpose Optimizer Tests Start
 
-    def run_transpose_compare(self, output_names_with_port, onnx_feed_dict, origin_proto,
-                              remaining_transpose_num=None, debug=False, rtol=1e-07):
-        return self.run_and_compare(output_names_with_port, onnx_feed_dict, origin_proto, op_type="Transpose",
-                                    remaining_op_num=remaining_transpose_num, debug=debug, rtol=rtol)
+    run_transpose_compare = functools.partialmethod(run_and_compare, op_type="Transpose")
 
     def check_transpose_perm(self, model_proto, expected_perm):
         for node in model_proto.graph.node:
@@ -97,9 +193,9 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
             output_before_trans = list(input_shape)
             output_before_trans[axis] *= 2
             output_shape = [output_before_trans[i] for i in [0, 3, 1, 2]]
-            node1 = helper.make_node("Transpose", ["input_data1"], ["Y"], perm=[0, 2, 3, 1], name="trans")
+            node1 = _make_transpose("input_data1", "Y", _PERM_NCHW_TO_NHWC, name="trans")
             node2 = helper.make_node("Concat", ["Y", "input_data2"], ["Z"], axis=axis, name="concat")
-            node3 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans2")
+            node3 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans2")
 
             graph = helper.make_graph(
                 [node1, node2, node3],
@@ -111,17 +207,17 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
             )
 
             model_proto = self.make_model(graph, producer_name="onnx-tests")
-            feed_dict = {"input_data1": np.random.randn(*input_shape_with_trans).astype(np.float32),
-                         "input_data2": np.random.randn(*input_shape).astype(np.float32),
+            feed_dict = {"input_data1": self.rng.standard_normal(input_shape_with_trans, dtype=np.float32),
+                         "input_data2": self.rng.standard_normal(input_shape, dtype=np.float32),
                          }
-            self.run_transpose_compare(["res"], feed_dict, model_proto, remaining_transpose_num=1)
+            self.run_transpose_compare(["res"], feed_dict, model_proto, remaining_op_num=1)
 
     def test_transpose_with_add1(self):
         # when transpose follows with a broadcasting op
         # reshape is needed when switching transpose with this op and op need broadcast its inputs
-        node1 = helper.make_node("Transpose", ["input_data1"], ["Y"], perm=[0, 2, 3, 1], name="trans")
+        node1 = _make_transpose("input_data1", "Y", _PERM_NCHW_TO_NHWC, name="trans")
         node2 = helper.make_node("Add", ["Y", "input_data2"], ["Z"], name="add")
-        node3 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans2")
+        node3 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans2")
 
         graph = helper.make_graph(
             [node1, node2, node3],
@@ -133,15 +229,15 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        feed_dict = {"input_data1": np.random.randn(2, 3, 4, 5).astype(np.float32),
-                     "input_data2": np.random.randn(3).astype(np.float32),
+        feed_dict = {"input_data1": _X_2345,
+                     "input_data2": self.rng.standard_normal(3, dtype=np.float32),
                      }
-        self.run_transpose_compare(["res"], feed_dict, model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], feed_dict, model_proto, remaining_op_num=0)
 
     def test_transpose_with_add2(self):
-        node1 = helper.make_node("Transpose", ["input_data1"], ["Y"], perm=[0, 2, 3, 1], name="trans")
+        node1 = _make_transpose("input_data1", "Y", _PERM_NCHW_TO_NHWC, name="trans")
         node2 = helper.make_node("Add", ["Y", "input_data2"], ["Z"], name="add")
-        node3 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans2")
+        node3 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans2")
 
         graph = helper.make_graph(
             [node1, node2, node3],
@@ -153,51 +249,35 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        feed_dict = {"input_data1": np.random.randn(2, 3, 4, 5).astype(np.float32),
-                     "input_data2": np.random.randn(2, 4, 5, 3).astype(np.float32),
+        feed_dict = {"input_data1": _X_2345,
+                     "input_data2": self.rng.standard_normal((2, 4, 5, 3), dtype=np.float32),
                      }
-        self.run_transpose_compare(["res"], feed_dict, model_proto, remaining_transpose_num=1)
+        self.run_transpose_compare(["res"], feed_dict, model_proto, remaining_op_num=1)
 
     def test_transpose_relu(self):
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
-        node2 = helper.make_node("Relu", ["Y"], ["Z"], name="relu")
-        node3 = helper.make_node("Transpose", ["Z"], ["Z1"], perm=[0, 3, 1, 2], name="trans_2")
-
-        graph = helper.make_graph(
-            [node1, node2, node3],
-            "relu-test",
-            [helper.make_tensor_value_info("X", TensorProto.FLOAT, (2, 3, 4, 5))],
-            [helper.make_tensor_value_info("Z1", TensorProto.FLOAT, (2, 3, 4, 5))],
-        )
+        node = helper.make_node("Relu", ["Y"], ["Z"], name="relu")
+        graph = _make_nchw_nhwc_transpose_graph([node], "relu-test")
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Z1"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["Z1"], {"X": _X_2345},
+                                   model_proto, remaining_op_num=0)
 
     def test_transpose_leaky_relu(self):
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
-        node2 = helper.make_node("LeakyRelu", ["Y"], ["Z"], alpha=0.02, name="relu")
-        node3 = helper.make_node("Transpose", ["Z"], ["Z1"], perm=[0, 3, 1, 2], name="trans_2")
-
-        graph = helper.make_graph(
-            [node1, node2, node3],
-            "LeakyRelu-test",
-            [helper.make_tensor_value_info("X", TensorProto.FLOAT, (2, 3, 4, 5))],
-            [helper.make_tensor_value_info("Z1", TensorProto.FLOAT, (2, 3, 4, 5))],
-        )
+        node = helper.make_node("LeakyRelu", ["Y"], ["Z"], alpha=0.02, name="relu")
+        graph = _make_nchw_nhwc_transpose_graph([node], "LeakyRelu-test")
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Z1"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["Z1"], {"X": _X_2345},
+                                   model_proto, remaining_op_num=0)
 
     @check_opset_min_version(10, "Slice in opset 10 can accept dymaic 'start' and 'ends'")
     def test_transpose_slice(self):
         starts = np.array([0, 0, 0, 0], dtype=np.int64)
         ends = np.array([1, 2, 1, 2], dtype=np.int64)
         axes = np.array([0, 1, 2, 3], dtype=np.int64)
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
+        node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_1")
         node2 = helper.make_node("Slice", ["Y", "starts", "ends", "axes"], ["Z"], name="relu")
-        node3 = helper.make_node("Transpose", ["Z"], ["Z1"], perm=[0, 3, 1, 2], name="trans_2")
+        node3 = _make_transpose("Z", "Z1", _PERM_NHWC_TO_NCHW, name="trans_2")
 
         graph = helper.make_graph(
             [node1, node2, node3],
@@ -212,8 +292,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Z1"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["Z1"], {"X": _X_2345},
+                                   model_proto, remaining_op_num=0)
 
     @check_opset_min_version(8, "Max in opset 10 supports broadcasting")
     def test_transpose_max(self):
@@ -221,28 +301,20 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         const_1 = helper.make_tensor("const_1", TensorProto.FLOAT, (1,), const_1_val)
         const_1_node = helper.make_node("Constant", [], ["const_1"], value=const_1, name="const_1")
 
-        const_2_val = np.random.randn(2, 4, 5, 3).astype(np.float32)
-        const_2 = helper.make_tensor("const_2", TensorProto.FLOAT, (2, 4, 5, 3), const_2_val.flatten())
+        const_2_val = self.rng.standard_normal((2, 4, 5, 3), dtype=np.float32)
+        const_2 = helper.make_tensor("const_2", TensorProto.FLOAT, (2, 4, 5, 3), const_2_val.tobytes(), raw=True)
         const_2_node = helper.make_node("Constant", [], ["const_2"], value=const_2, name="const_2")
 
-        const_3_val = np.random.randn(2, 4, 5, 3).astype(np.float32)
-        const_3 = helper.make_tensor("const_3", TensorProto.FLOAT, (2, 4, 5, 3), const_3_val.flatten())
+        const_3_val = self.rng.standard_normal((2, 4, 5, 3), dtype=np.float32)
+        const_3 = helper.make_tensor("const_3", TensorProto.FLOAT, (2, 4, 5, 3), const_3_val.tobytes(), raw=True)
         const_3_node = helper.make_node("Constant", [], ["const_3"], value=const_3, name="const_3")
 
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
-        node2 = helper.make_node("Max", ["Y", "const_3", "const_2", "const_1"], ["Z"], name="max")
-        node3 = helper.make_node("Transpose", ["Z"], ["Z1"], perm=[0, 3, 1, 2], name="trans_2")
-
-        graph = helper.make_graph(
-            [const_1_node, const_2_node, const_3_node, node1, node2, node3],
-            "Max-test",
-            [helper.make_tensor_value_info("X", TensorProto.FLOAT, (2, 3, 4, 5))],
-            [helper.make_tensor_value_info("Z1", TensorProto.FLOAT, (2, 3, 4, 5))],
-        )
+        node = helper.make_node("Max", ["Y", "const_3", "const_2", "const_1"], ["Z"], name="max")
+        graph = _make_nchw_nhwc_transpose_graph([const_1_node, const_2_node, const_3_node, node], "Max-test")
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Z1"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["Z1"], {"X": _X_2345},
+                                   model_proto, remaining_op_num=0)
 
     @check_opset_min_version(8, "Max in opset 10 supports broadcasting")
     def test_transpose_max_input_non_const(self):
@@ -250,13 +322,13 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         const_1 = helper.make_tensor("const_1", TensorProto.FLOAT, (1,), const_1_val)
         const_1_node = helper.make_node("Constant", [], ["const_1"], value=const_1, name="const_1")
 
-        const_2_val = np.random.randn(2, 4, 5, 3).astype(np.float32)
-        const_2 = helper.make_tensor("const_2", TensorProto.FLOAT, (2, 4, 5, 3), const_2_val.flatten())
+        const_2_val = self.rng.standard_normal((2, 4, 5, 3), dtype=np.float32)
+        const_2 = helper.make_tensor("const_2", TensorProto.FLOAT, (2, 4, 5, 3), const_2_val.tobytes(), raw=True)
         const_2_node = helper.make_node("Constant", [], ["const_2"], value=const_2, name="const_2")
 
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
+        node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_1")
         node2 = helper.make_node("Max", ["Y", "non_const", "const_2", "const_1"], ["Z"], name="max")
-        node3 = helper.make_node("Transpose", ["Z"], ["Z1"], perm=[0, 3, 1, 2], name="trans_2")
+        node3 = _make_transpose("Z", "Z1", _PERM_NHWC_TO_NCHW, name="trans_2")
 
         graph = helper.make_graph(
             [const_1_node, const_2_node, node1, node2, node3],
@@ -267,59 +339,57 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Z1"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32),
-                                            "non_const": np.random.randn(2, 4, 5, 3).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=1)
+        self.run_transpose_compare(["Z1"], {"X": _X_2345,
+                                            "non_const": self.rng.standard_normal((2, 4, 5, 3), dtype=np.float32)},
+                                   model_proto, remaining_op_num=1)
 
     def test_transpose_merge(self):
-        node0 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans")
-        node1 = helper.make_node("Transpose", ["X"], ["Y_1"], perm=[0, 2, 3, 1], name="trans_1")
+        node0 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans")
+        node1 = _make_transpose("X", "Y_1", _PERM_NCHW_TO_NHWC, name="trans_1")
         node2 = helper.make_node("Mul", ["Y", "Y_1"], ["OUT"], name="mul")
 
         graph = helper.make_graph(
             [node0, node1, node2],
             "transpose-merge-test",
-            [helper.make_tensor_value_info("X", TensorProto.FLOAT, (2, 3, 4, 5))],
+            [_X_INFO],
             [helper.make_tensor_value_info("OUT", TensorProto.FLOAT, (2, 4, 5, 3))],
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["OUT"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=1)
+        self.run_transpose_compare(["OUT"], {"X": _X_2345},
+                                   model_proto, remaining_op_num=1)
 
     def test_transpose_with_shape(self):
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans")
-        node2 = helper.make_node("Shape", ["Y"], ["Z"], name="shape")
+        node = helper.make_node("Shape", ["Y"], ["Z"], name="shape")
 
         graph = helper.make_graph(
-            [node1, node2],
+            [_TRANS_NCHW_TO_NHWC, node],
             "transpose_with_shape",
-            [helper.make_tensor_value_info("X", TensorProto.FLOAT, (2, 3, 4, 5))],
+            [_X_FP16_INFO],
             [helper.make_tensor_value_info("Z", TensorProto.INT64, [4])],
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Z"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["Z"], {"X": _X_2345_FP16},
+                                   model_proto, remaining_op_num=0)
 
     def test_transpose_with_identity(self):
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans")
-        node2 = helper.make_node("Identity", ["Y"], ["Z"], name="identity")
+        node = helper.make_node("Identity", ["Y"], ["Z"], name="identity")
 
         graph = helper.make_graph(
-            [node1, node2],
+            [_TRANS_NCHW_TO_NHWC, node],
             "transpose_with_identity",
-            [helper.make_tensor_value_info("X", TensorProto.FLOAT, (2, 3, 4, 5))],
-            [helper.make_tensor_value_info("Z", TensorProto.FLOAT, (2, 4, 5, 3))],
+            [_X_FP16_INFO],
+            [helper.make_tensor_value_info("Z", TensorProto.FLOAT16, (2, 4, 5, 3))],
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Z"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=1)
+        self.run_transpose_compare(["Z"], {"X": _X_2345_FP16},
+                                   model_proto, remaining_op_num=1)
 
     def test_transpose_with_squeeze1(self):
         # squeeze the first dim
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans")
+        node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans")
         node2 = helper.make_node("Squeeze", ["Y"], ["Z"], name="squeeze", axes=[0])
 
         graph = helper.make_graph(
@@ -330,13 +400,13 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        model_after_opt = self.run_transpose_compare(["Z"], {"X": np.random.randn(1, 3, 4, 5).astype(np.float32)},
-                                                     model_proto, remaining_transpose_num=1)
+        feed_dict = {"X": self.rng.standard_normal((1, 3, 4, 5), dtype=np.float32)}
+        model_after_opt = self.run_transpose_compare(["Z"], feed_dict, model_proto, remaining_op_num=1)
         self.check_transpose_perm(model_after_opt, [1, 2, 0])
 
     def test_transpose_with_squeeze2(self):
         # squeeze the second dim
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans")
+        node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans")
         node2 = helper.make_node("Squeeze", ["Y"], ["Z"], name="squeeze", axes=[1])
 
         graph = helper.make_graph(
@@ -347,13 +417,13 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        model_after_opt = self.run_transpose_compare(["Z"], {"X": np.random.randn(3, 4, 1, 5).astype(np.float32)},
-                                                     model_proto, remaining_transpose_num=1)
+        feed_dict = {"X": self.rng.standard_normal((3, 4, 1, 5), dtype=np.float32)}
+        model_after_opt = self.run_transpose_compare(["Z"], feed_dict, model_proto, remaining_op_num=1)
         self.check_transpose_perm(model_after_opt, [0, 2, 1])
 
     def test_transpose_with_squeeze3(self):
         # squeeze the last dim
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans")
+        node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans")
         node2 = helper.make_node("Squeeze", ["Y"], ["Z"], name="squeeze", axes=[3])
 
         graph = helper.make_graph(
@@ -364,12 +434,12 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Z"], {"X": np.random.randn(3, 1, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["Z"], {"X": self.rng.standard_normal((3, 1, 4, 5), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_transpose_with_squeeze4(self):
         # squeeze the two dims
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans")
+        node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans")
         node2 = helper.make_node("Squeeze", ["Y"], ["Z"], name="squeeze", axes=[1, 3])
 
         graph = helper.make_graph(
@@ -380,8 +450,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Z"], {"X": np.random.randn(3, 1, 1, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["Z"], {"X": self.rng.standard_normal((3, 1, 1, 5), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_transpose_with_loop(self):
         def _define_loop_graph(external_inputs):
@@ -390,7 +460,7 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
             # computation
             # for(...){a = external_inputs[i]; b = trans(a), c = squeeze(b)}, c is scan output
             node1 = helper.make_node("Gather", [external_inputs[0], "loop_iter_num"], ["Y0"])
-            node2 = helper.make_node("Transpose", ["Y0"], ["Z0"], perm=[0, 2, 3, 1])
+            node2 = _make_transpose("Y0", "Z0", _PERM_NCHW_TO_NHWC)
             # graph output
             node3 = helper.make_node("Squeeze", ["Z0"], ["scan_output"], axes=[0])
             node4 = helper.make_node("Identity", ["loop_condition"], ["loop_cond_output"])
@@ -412,14 +482,14 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
 
         def _make_loop(external_inputs, outputs):
             trip_cnt = self._make_onnx_const(np.array(10, dtype=np.int64), "trip_cnt")
-            cond = self._make_onnx_const(np.array(True, dtype=np.bool), "cond")
+            cond = self._make_onnx_const(np.array(True, dtype=np.bool_), "cond")
             sub_graph = _define_loop_graph(external_inputs)
             loop_node = helper.make_node("Loop", ["trip_cnt", "cond", "cond"], outputs,
                                          name="loop", body=sub_graph)
             return trip_cnt, cond, loop_node
 
         nodes = _make_loop(["array"], ["loop_carried", "scan_out"])
-        res = helper.make_node("Transpose", ["scan_out"], ["Y"], perm=[0, 3, 1, 2], name="trans")
+        res = _make_transpose("scan_out", "Y", _PERM_NHWC_TO_NCHW, name="trans")
 
         graph = helper.make_graph(
             [*nodes, res],
@@ -429,24 +499,25 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["Y"], {"array": np.random.randn(10, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["Y"], {"array": self.rng.standard_normal((10, 3, 4, 5), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_trans_with_sub(self):
         io_shape = [2, 3, 4, 5]
         const_shapes = [[2, 4, 5, 3], [4, 5, 3], [5, 3], [3]]
         for trans_is_first_input in [True, False]:
             for const_shape in const_shapes:
-                node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_a")
+                node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_a")
+                const_val = self.rng.standard_normal(const_shape, dtype=np.float32)
                 const_tensor = helper.make_tensor(name='const', data_type=TensorProto.FLOAT, dims=const_shape,
-                                                  vals=np.random.randn(*const_shape).flatten().astype(np.float32))
+                                                  vals=const_val.flatten())
                 node2 = helper.make_node("Constant", [], ["const"], value=const_tensor, name="const")
                 if trans_is_first_input:
                     node3 = helper.make_node("Sub", ["Y", "const"], ["Z"], name="sub")
                 else:
                     node3 = helper.make_node("Sub", ["const", "Y"], ["Z"], name="sub")
 
-                node4 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans_b")
+                node4 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans_b")
                 graph = helper.make_graph(
                     [node1, node2, node3, node4],
                     "test_trans_with_sub",
@@ -455,21 +526,21 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
                 )
 
                 model_proto = self.make_model(graph, producer_name="onnx-tests")
-                self.run_transpose_compare(["res"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                           model_proto, remaining_transpose_num=0)
+                self.run_transpose_compare(["res"], {"X": _X_2345},
+                                           model_proto, remaining_op_num=0)
 
     def test_trans_with_sub_input_non_const(self):
         io_shape = [2, 3, 4, 5]
         non_const_shapes = [[2, 4, 5, 3], [4, 5, 3], [5, 3]]
         for trans_is_first_input in [True, False]:
             for non_const_shape in non_const_shapes:
-                node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_a")
+                node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_a")
                 if trans_is_first_input:
                     node2 = helper.make_node("Sub", ["Y", "non_const"], ["Z"], name="sub")
                 else:
                     node2 = helper.make_node("Sub", ["non_const", "Y"], ["Z"], name="sub")
 
-                node3 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans_b")
+                node3 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans_b")
                 graph = helper.make_graph(
                     [node1, node2, node3],
                     "test_trans_with_sub_input_non_const",
@@ -479,15 +550,15 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
                 )
 
                 model_proto = self.make_model(graph, producer_name="onnx-tests")
-                self.run_transpose_compare(["res"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32),
-                                                     "non_const": np.random.randn(*non_const_shape).astype(np.float32)},
-                                           model_proto, remaining_transpose_num=1)
+                non_const_val = self.rng.standard_normal(non_const_shape, dtype=np.float32)
+                self.run_transpose_compare(["res"], {"X": _X_2345, "non_const": non_const_val},
+                                           model_proto, remaining_op_num=1)
 
     def test_transpose_add_with_input_non_const(self):
 
-        node0 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
+        node0 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_1")
         node1 = helper.make_node("Add", ["Y", "A"], ["Z"], name="add")
-        node2 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans_2")
+        node2 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans_2")
 
         graph = helper.make_graph(
             [node0, node1, node2],
@@ -498,18 +569,18 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"X": np.random.randn(1, 1, 3, 3).astype(np.float32),
-                                             "A": np.random.randn(1, 3, 3, 1).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"X": self.rng.standard_normal((1, 1, 3, 3), dtype=np.float32),
+                                             "A": self.rng.standard_normal((1, 3, 3, 1), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_transpose_add_with_input_const(self):
-        const_1_val = np.random.randn(1, 3, 3, 1).astype(np.float32)
+        const_1_val = self.rng.standard_normal((1, 3, 3, 1), dtype=np.float32)
         const_1 = helper.make_tensor("const_1", TensorProto.FLOAT, (1, 3, 3, 1), const_1_val.flatten())
         const_1_node = helper.make_node("Constant", [], ["const_1"], value=const_1, name="const_1")
 
-        node0 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
+        node0 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_1")
         node1 = helper.make_node("Add", ["Y", "const_1"], ["Z"], name="add")
-        node2 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans_2")
+        node2 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans_2")
 
         graph = helper.make_graph(
             [const_1_node, node0, node1, node2],
@@ -519,19 +590,19 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"X": np.random.randn(1, 1, 3, 3).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"X": self.rng.standard_normal((1, 1, 3, 3), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_transpose_add_with_conv_1(self):
         # case where bias's dim is 1D and can be merged into Conv
-        const_b_val = np.random.randn(1, 1, 1, 16).astype(np.float32)
+        const_b_val = self.rng.standard_normal((1, 1, 1, 16), dtype=np.float32)
         const_b = helper.make_tensor("const_b", TensorProto.FLOAT, (1, 1, 1, 16), const_b_val.flatten())
         const_b_node = helper.make_node("Constant", [], ["const_b"], value=const_b, name="const_b")
 
         node0 = helper.make_node("Conv", ["x", "W"], ["X"], name="conv", pads=[0, 0, 0, 0])
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
+        node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_1")
         node2 = helper.make_node("Add", ["Y", "const_b"], ["Z"], name="add")
-        node3 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans_2")
+        node3 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans_2")
 
         graph = helper.make_graph(
             [const_b_node, node0, node1, node2, node3],
@@ -542,21 +613,21 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"x": np.random.randn(1, 5, 3, 3).astype(np.float32),
-                                             "W": np.random.randn(16, 5, 3, 3).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"x": self.rng.standard_normal((1, 5, 3, 3), dtype=np.float32),
+                                             "W": self.rng.standard_normal((16, 5, 3, 3), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_transpose_add_with_conv_2(self):
         # case where bias's dim is not 1D and can't be merged into Conv
         # add handler just remove the transpose around Add node
-        const_b_val = np.random.randn(1, 3, 3, 1).astype(np.float32)
+        const_b_val = self.rng.standard_normal((1, 3, 3, 1), dtype=np.float32)
         const_b = helper.make_tensor("const_b", TensorProto.FLOAT, (1, 3, 3, 1), const_b_val.flatten())
         const_b_node = helper.make_node("Constant", [], ["const_b"], value=const_b, name="const_b")
 
         node0 = helper.make_node("Conv", ["x", "W"], ["X"], name="conv", pads=[0, 0, 0, 0])
-        node1 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
+        node1 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_1")
         node2 = helper.make_node("Add", ["Y", "const_b"], ["Z"], name="add")
-        node3 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans_2")
+        node3 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans_2")
 
         graph = helper.make_graph(
             [const_b_node, node0, node1, node2, node3],
@@ -567,15 +638,15 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"x": np.random.randn(1, 1, 5, 5).astype(np.float32),
-                                             "W": np.random.randn(1, 1, 3, 3).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"x": self.rng.standard_normal((1, 1, 5, 5), dtype=np.float32),
+                                             "W": self.rng.standard_normal((1, 1, 3, 3), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     @check_opset_max_version(10, "pad")
     def test_transpose_pad(self):
-        node0 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
+        node0 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_1")
         node1 = helper.make_node("Pad", ["Y"], ["Z"], pads=[1, 0, 1, 3, 0, 0, 2, 0], name="pad")
-        node2 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans_2")
+        node2 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans_2")
 
         graph = helper.make_graph(
             [node0, node1, node2],
@@ -585,8 +656,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"X": np.random.randn(1, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"X": self.rng.standard_normal((1, 3, 4, 5), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     @check_opset_min_version(11, "pad")
     def test_transpose_pad11(self):
@@ -595,9 +666,9 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         pads_tensor = helper.make_tensor("Pads", TensorProto.INT64, [8], pads_val)
         pads_const = helper.make_node("Constant", [], ["Pads"], value=pads_tensor, name="Pads")
 
-        node0 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
+        node0 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_1")
         node1 = helper.make_node("Pad", ["Y", "Pads"], ["Z"], name="pad")
-        node2 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans_2")
+        node2 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans_2")
 
         graph = helper.make_graph(
             [node0, node1, node2, pads_const],
@@ -607,13 +678,13 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"X": np.random.randn(1, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"X": self.rng.standard_normal((1, 3, 4, 5), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_transpose_reducemean(self):
-        node0 = helper.make_node("Transpose", ["X"], ["Y"], perm=[0, 2, 3, 1], name="trans_1")
+        node0 = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans_1")
         node1 = helper.make_node("ReduceMean", ["Y"], ["Z"], axes=[1, 2], keepdims=1, name="reducemean")
-        node2 = helper.make_node("Transpose", ["Z"], ["res"], perm=[0, 3, 1, 2], name="trans_2")
+        node2 = _make_transpose("Z", "res", _PERM_NHWC_TO_NCHW, name="trans_2")
 
         graph = helper.make_graph(
             [node0, node1, node2],
@@ -623,14 +694,14 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"X": np.random.randn(1, 3, 4, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"X": self.rng.standard_normal((1, 3, 4, 5), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_trans_output_as_graph_outputs(self):
         """
         If transpose's output is graph's output, don't optimize it.
         """
-        trans = helper.make_node("Transpose", ["X"], ["Y"], name="trans", perm=[0, 2, 3, 1])
+        trans = _make_transpose("X", "Y", _PERM_NCHW_TO_NHWC, name="trans")
         graph_proto = helper.make_graph(
             [trans],
             "trans-to-graph-output",
@@ -652,6 +723,21 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
 
         self.assertTrue(trans_cnt == 1, msg="Expect 1 Transpose ops left, but actually " + str(trans_cnt) + " left")
 
+    def test_transpose_relu_without_shape_inference(self):
+        # run_and_compare optimizes the model after onnx shape inference, also cover the case where
+        # the shapes of intermediate tensors are unknown to the optimizer
+        node = helper.make_node("Relu", ["Y"], ["Z"], name="relu")
+        graph_proto = _make_nchw_nhwc_transpose_graph([node], "relu-test")
+
+        graph = GraphUtil.create_graph_from_onnx_graph(graph_proto, self.config.opset)
+        optimized_graph = GraphUtil.optimize_graph(graph)
+
+        self.assertTrue(optimized_graph, msg="graph after optimizer should not be None")
+
+        trans_cnt = len(group_nodes_by_type(optimized_graph)["Transpose"])
+
+        self.assertTrue(trans_cnt == 0, msg="Expect 0 Transpose ops left, but actually " + str(trans_cnt) + " left")
+
     def test_trans_can_be_replaced_with_reshape1(self):
         # test trans-NHWC
         input_shapes_np = [(2, 3, 4, 1), (2, 1, 1, 4), (2, 3, 4, 1)]
@@ -668,8 +754,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
             )
 
             model_proto = self.make_model(graph, producer_name="onnx-tests")
-            self.run_transpose_compare(["Y"], {"X": np.random.randn(*input_shape_np).astype(np.float32)},
-                                       model_proto, remaining_transpose_num=0)
+            self.run_transpose_compare(["Y"], {"X": self.rng.standard_normal(input_shape_np, dtype=np.float32)},
+                                       model_proto, remaining_op_num=0)
 
     def test_trans_can_be_replaced_with_reshape2(self):
         # test trans-NCHW
@@ -687,17 +773,17 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
             )
 
             model_proto = self.make_model(graph, producer_name="onnx-tests")
-            self.run_transpose_compare(["Y"], {"X": np.random.randn(*input_shape_np).astype(np.float32)},
-                                       model_proto, remaining_transpose_num=0)
+            self.run_transpose_compare(["Y"], {"X": self.rng.standard_normal(input_shape_np, dtype=np.float32)},
+                                       model_proto, remaining_op_num=0)
 
     def test_two_transposes_switch_with_mul(self):
         const_node = self._make_onnx_const(np.array(10, dtype=np.float32), "const_10")
-        node0 = helper.make_node("Transpose", ["u1"], ["v1"], perm=[0, 2, 3, 1], name="trans_0")
-        node1 = helper.make_node("Transpose", ["u2"], ["v2"], perm=[0, 2, 3, 1], name="trans_1")
+        node0 = _make_transpose("u1", "v1", _PERM_NCHW_TO_NHWC, name="trans_0")
+        node1 = _make_transpose("u2", "v2", _PERM_NCHW_TO_NHWC, name="trans_1")
 
         node2 = helper.make_node("Mul", ["v1", "v2"], ["x"], name="mul_1")
         node3 = helper.make_node("Mul", ["x", const_node.output[0]], ["y"], name="mul_2")
-        node4 = helper.make_node("Transpose", ["y"], ["res"], perm=[0, 3, 1, 2], name="trans_3")
+        node4 = _make_transpose("y", "res", _PERM_NHWC_TO_NCHW, name="trans_3")
 
         graph = helper.make_graph(
             [const_node, node0, node1, node2, node3, node4],
@@ -708,19 +794,19 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"u1": np.random.randn(1, 6, 8, 9).astype(np.float32),
-                                             "u2": np.random.randn(1, 6, 8, 9).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"u1": self.rng.standard_normal((1, 6, 8, 9), dtype=np.float32),
+                                             "u2": self.rng.standard_normal((1, 6, 8, 9), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_many_transposes_and_constant_switch_with_sum(self):
-        constnode = self._make_onnx_const(np.array(np.random.random((1, 8, 9, 6)), dtype=np.float32), "v4")
-        node0 = helper.make_node("Transpose", ["u1"], ["v1"], perm=[0, 2, 3, 1], name="trans_0")
-        node1 = helper.make_node("Transpose", ["u2"], ["v2"], perm=[0, 2, 3, 1], name="trans_1")
-        node11 = helper.make_node("Transpose", ["u3"], ["v3"], perm=[0, 2, 3, 1], name="trans_2")
+        constnode = self._make_onnx_const(self.rng.random((1, 8, 9, 6), dtype=np.float32), "v4")
+        node0 = _make_transpose("u1", "v1", _PERM_NCHW_TO_NHWC, name="trans_0")
+        node1 = _make_transpose("u2", "v2", _PERM_NCHW_TO_NHWC, name="trans_1")
+        node11 = _make_transpose("u3", "v3", _PERM_NCHW_TO_NHWC, name="trans_2")
 
         node2 = helper.make_node("Sum", ["v1", "v2", "v3", "v4"], ["x"], name="sum_1")
         node3 = helper.make_node("Sum", ["x", "v1"], ["y"], name="sum_2")
-        node4 = helper.make_node("Transpose", ["y"], ["res"], perm=[0, 3, 1, 2], name="trans_4")
+        node4 = _make_transpose("y", "res", _PERM_NHWC_TO_NCHW, name="trans_4")
 
         graph = helper.make_graph(
             [constnode, node0, node1, node11, node2, node3, node4],
@@ -731,19 +817,16 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
             [helper.make_tensor_value_info("res", TensorProto.FLOAT, (1, 6, 8, 9))],
         )
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"u1": np.random.randn(1, 6, 8, 9).astype(np.float32),
-                                             "u2": np.random.randn(1, 6, 8, 9).astype(np.float32),
-                                             "u3": np.random.randn(1, 6, 8, 9).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"u1": self.rng.standard_normal((1, 6, 8, 9), dtype=np.float32),
+                                             "u2": self.rng.standard_normal((1, 6, 8, 9), dtype=np.float32),
+                                             "u3": self.rng.standard_normal((1, 6, 8, 9), dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     # Tranpose Optimizer Tests End
 
     # Identity Optimizer Tests Start
 
-    def run_identity_compare(self, output_names_with_port, onnx_feed_dict, origin_proto,
-                             remaining_identity_num=None, debug=False, rtol=1e-07):
-        self.run_and_compare(output_names_with_port, onnx_feed_dict, origin_proto, op_type="Identity",
-                             remaining_op_num=remaining_identity_num, debug=debug, rtol=rtol)
+    run_identity_compare = functools.partialmethod(run_and_compare, op_type="Identity")
 
     def test_identity_non_graph_output(self):
         node1 = helper.make_node("Add", ["X", "X"], ["Y"], name="add")
@@ -758,8 +841,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_identity_compare(["Z1"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                  model_proto, remaining_identity_num=0)
+        self.run_identity_compare(["Z1"], {"X": _X_2345},
+                                  model_proto, remaining_op_num=0)
 
     def test_identity_unremovable_identity(self):
         # should not remove!!
@@ -773,8 +856,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_identity_compare(["Y"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                  model_proto, remaining_identity_num=1)
+        self.run_identity_compare(["Y"], {"X": _X_2345},
+                                  model_proto, remaining_op_num=1)
 
     def test_identity_output_as_multiple_graph_outputs(self):
         # handle case like this, both Identity nodes are graph outputs,
@@ -794,8 +877,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_identity_compare(["Z1", "Z2"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                  model_proto, remaining_identity_num=1)
+        self.run_identity_compare(["Z1", "Z2"], {"X": _X_2345},
+                                  model_proto, remaining_op_num=1)
 
     def test_identity_in_subgraph_non_graph_output(self):
         node1 = helper.make_node("Add", ["X", "X"], ["Y"], name="add")
@@ -809,11 +892,12 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
                 name='iterate_num_value',
                 data_type=TensorProto.INT64,
                 dims=iter_num_value.shape,
-                vals=iter_num_value.flatten().astype(np.int64),
+                vals=iter_num_value.tobytes(),
+                raw=True,
             ),
         )
 
-        cond_value = np.array(True, dtype=np.bool)
+        cond_value = np.array(True, dtype=np.bool_)
         node3 = helper.make_node(
             'Constant',
             inputs=[],
@@ -821,8 +905,9 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
             value=helper.make_tensor(
                 name='cond_value',
                 data_type=TensorProto.BOOL,
-                dims=iter_num_value.shape,
-                vals=cond_value.flatten().astype(np.bool),
+                dims=cond_value.shape,
+                vals=cond_value.tobytes(),
+                raw=True,
             ),
         )
 
@@ -858,8 +943,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_identity_compare(["Z1"], {"X": np.random.randn(2, 3, 4, 5).astype(np.float32)},
-                                  model_proto, remaining_identity_num=0)
+        self.run_identity_compare(["Z1"], {"X": _X_2345},
+                                  model_proto, remaining_op_num=0)
 
     # Identity Optimizer Tests End
 
@@ -889,8 +974,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_merge_duplicated_nodes_compare(["OUT"], {"X": np.random.randn(5, 5).astype(np.float32)}, model_proto,
-                                                op_type="Add", remaining_op_num=2)
+        self.run_merge_duplicated_nodes_compare(["OUT"], {"X": self.rng.standard_normal((5, 5), dtype=np.float32)},
+                                                model_proto, op_type="Add", remaining_op_num=2)
 
     def test_duplicated_duplicated_attributes(self):
         # same attr or not
@@ -908,8 +993,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_merge_duplicated_nodes_compare(["OUT"], {"X": np.random.randn(5, 5).astype(np.float32)}, model_proto,
-                                                op_type="ReduceSum", remaining_op_num=2)
+        self.run_merge_duplicated_nodes_compare(["OUT"], {"X": self.rng.standard_normal((5, 5), dtype=np.float32)},
+                                                model_proto, op_type="ReduceSum", remaining_op_num=2)
 
     def _check_initializer_num(self, graph_proto, num):
         print(len(graph_proto.initializer))
@@ -979,7 +1064,7 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
         self.run_merge_duplicated_nodes_compare(["value1", "value2"],
-                                                {"X": np.random.randn(5, 5).astype(np.float32)}, model_proto,
+                                                {"X": self.rng.standard_normal((5, 5), dtype=np.float32)}, model_proto,
                                                 op_type="Add", remaining_op_num=2)
 
     @check_opset_min_version(10, "Dropout in opset 10 produces mask of 'bool' type")
@@ -999,7 +1084,7 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
         self.run_merge_duplicated_nodes_compare(["value1", "mask", "value2"],
-                                                {"X": np.random.randn(5).astype(np.float32)},
+                                                {"X": self.rng.standard_normal(5, dtype=np.float32)},
                                                 model_proto,
                                                 op_type="Dropout", remaining_op_num=2)
 
@@ -1022,7 +1107,7 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_merge_duplicated_nodes_compare(["res"], {"X": np.random.randn(5).astype(np.float32)},
+        self.run_merge_duplicated_nodes_compare(["res"], {"X": self.rng.standard_normal(5, dtype=np.float32)},
                                                 model_proto,
                                                 op_type="Log", remaining_op_num=3)
 
@@ -1033,7 +1118,7 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
     def test_const_fold_trans_with_const1(self):
         shape = (6, 6)
         const_tensor = helper.make_tensor(name='const_tensor', data_type=TensorProto.FLOAT, dims=shape,
-                                          vals=np.random.randn(*shape).flatten().astype(np.float32))
+                                          vals=self.rng.standard_normal(shape, dtype=np.float32).flatten())
         node1 = helper.make_node("Constant", [], ["const"], value=const_tensor)
         node2 = helper.make_node("Transpose", ["const"], ["value1"])
         node3 = helper.make_node("Add", ["value1", "X"], ["res"])
@@ -1046,14 +1131,14 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"X": np.random.randn(*shape).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"X": self.rng.standard_normal(shape, dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_const_fold_trans_with_const2(self):
         # need multiple optimization run
         shape = (6, 6)
         const_tensor = helper.make_tensor(name='const_tensor', data_type=TensorProto.FLOAT, dims=shape,
-                                          vals=np.random.randn(*shape).flatten().astype(np.float32))
+                                          vals=self.rng.standard_normal(shape, dtype=np.float32).flatten())
         node1 = helper.make_node("Constant", [], ["const"], value=const_tensor)
         node2 = helper.make_node("Transpose", ["const"], ["value1"])
         node3 = helper.make_node("Transpose", ["value1"], ["value2"])
@@ -1067,14 +1152,14 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"X": np.random.randn(*shape).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=0)
+        self.run_transpose_compare(["res"], {"X": self.rng.standard_normal(shape, dtype=np.float32)},
+                                   model_proto, remaining_op_num=0)
 
     def test_const_fold_node_is_output(self):
         # need multiple optimization run
         shape = (6, 6)
         const_tensor = helper.make_tensor(name='const_tensor', data_type=TensorProto.FLOAT, dims=shape,
-                                          vals=np.random.randn(*shape).flatten().astype(np.float32))
+                                          vals=self.rng.standard_normal(shape, dtype=np.float32).flatten())
         node1 = helper.make_node("Constant", [], ["const"], value=const_tensor)
         node2 = helper.make_node("Transpose", ["const"], ["value1"])
         node3 = helper.make_node("Transpose", ["value1"], ["res"])
@@ -1088,12 +1173,12 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
         self.run_transpose_compare(["res"], {},
-                                   model_proto, remaining_transpose_num=0)
+                                   model_proto, remaining_op_num=0)
 
     def test_const_fold_unsqueeze_with_const(self):
         shape = (6, 6)
         const_tensor = helper.make_tensor(name='const_tensor', data_type=TensorProto.FLOAT, dims=shape,
-                                          vals=np.random.randn(*shape).flatten().astype(np.float32))
+                                          vals=self.rng.standard_normal(shape, dtype=np.float32).flatten())
         node1 = helper.make_node("Constant", [], ["const"], value=const_tensor)
         node2 = helper.make_node("Unsqueeze", ["const"], ["value1"], axes=[0, 2, 3])
         node3 = helper.make_node("Add", ["value1", "X"], ["res"])
@@ -1106,13 +1191,13 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_and_compare(["res"], {"X": np.random.randn(1).astype(np.float32)}, model_proto,
+        self.run_and_compare(["res"], {"X": self.rng.standard_normal(1, dtype=np.float32)}, model_proto,
                              "Unsqueeze", 0)
 
     def test_const_fold_cast_with_const(self):
         shape = (6, 6)
         const_tensor = helper.make_tensor(name='const_tensor', data_type=TensorProto.FLOAT, dims=shape,
-                                          vals=np.random.randn(*shape).flatten().astype(np.float32))
+                                          vals=self.rng.standard_normal(shape, dtype=np.float32).flatten())
         node1 = helper.make_node("Constant", [], ["const"], value=const_tensor)
         node2 = helper.make_node("Cast", ["const"], ["value1"], to=TensorProto.INT64)
         node3 = helper.make_node("Add", ["value1", "X"], ["res"])
@@ -1125,15 +1210,15 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_and_compare(["res"], {"X": np.random.randn(*shape).astype(np.int64)}, model_proto,
+        self.run_and_compare(["res"], {"X": self.rng.standard_normal(shape).astype(np.int64)}, model_proto,
                              "Cast", 0)
 
     # Const Fold Optimizer Tests End
 
     def test_transpose_back_to_back_non_const(self):
 
-        node0 = helper.make_node("Transpose", ["u"], ["v"], perm=[0, 2, 3, 1], name="trans_0")
-        node1 = helper.make_node("Transpose", ["v"], ["w"], perm=[0, 3, 1, 2], name="trans_1")
+        node0 = _make_transpose("u", "v", _PERM_NCHW_TO_NHWC, name="trans_0")
+        node1 = _make_transpose("v", "w", _PERM_NHWC_TO_NCHW, name="trans_1")
         node2 = helper.make_node("Transpose", ["w"], ["x"], perm=[0, 3, 2, 1], name="trans_2")
         node3 = helper.make_node("Transpose", ["x"], ["res"], perm=[1, 3, 0, 2], name="trans_3")
 
@@ -1145,8 +1230,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
         )
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
-        self.run_transpose_compare(["res"], {"u": np.random.randn(5, 5, 5, 5).astype(np.float32)},
-                                   model_proto, remaining_transpose_num=1)
+        self.run_transpose_compare(["res"], {"u": self.rng.standard_normal((5, 5, 5, 5), dtype=np.float32)},
+                                   model_proto, remaining_op_num=1)
 
     @check_opset_min_version(9, "string type tensor")
     def test_cast_back_to_back_non_const_mixed_types(self):
@@ -1175,8 +1260,8 @@ class OptimizerTests(Tf2OnnxBackendTestBase):
 
         model_proto = self.make_model(graph, producer_name="onnx-tests")
 
-        self.run_and_compare(["res", "res2", "res3"], {"u": np.random.randn(1, 2, 3).astype(np.float32)}, model_proto,
-                             "Cast", 5)
+        self.run_and_compare(["res", "res2", "res3"], {"u": self.rng.standard_normal((1, 2, 3), dtype=np.float32)},
+                             model_proto, "Cast", 5)
 
 
 if __name__ == "__main__":